@@ -1,290 +1,439 @@
 # Import packages
 import os
-from datetime import date, timedelta, datetime
-import pandas as pd
-import numpy as np
-import statsapi
+import asyncio
+import csv
+import io
+import threading
+import time
+from datetime import timedelta, datetime
+from concurrent.futures import Future, ThreadPoolExecutor
 from crewai_tools import tool
 from crewai import Agent, Task, Crew, Process
 from langchain_groq import ChatGroq
+from groq import Groq
+import httpx
 from dotenv import load_dotenv
+from cachetools import LRUCache, TTLCache
+
+# statsapi responses are persisted across runs, since data for finished games never changes.
+# The cache directory is only opened on the first fetch, so importing this module stays cheap
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def _get_disk_cache():
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            import diskcache
+            _disk_cache = diskcache.Cache(os.getenv("STATSAPI_CACHE_DIR", ".statsapi_cache"))
+        return _disk_cache
+
+# Schedule statuses of games whose data will not change anymore
+_FINAL_STATUSES = ('Final', 'Game Over', 'Completed Early')
+
+def _is_final(game):
+    return (game.get('status') or '').startswith(_FINAL_STATUSES)
+
+def _schedule_finished(sched):
+    """Whether every game of a schedule is finished (an empty schedule may still get games)"""
+    return bool(sched) and all(_is_final(game) for game in sched)
+
+# Concurrent crews often ask for the same schedule or boxscore, so each key is fetched by one
+# caller at a time and everybody else waits for that result
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key, fetch, *args):
+    """Call fetch(*args) once for all concurrent callers with the same key and share its result"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if leader:
+        try:
+            future.set_result(fetch(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            # Later callers are served by the caches, failed fetches are retried
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    return future.result()
+
+# Schedules with unfinished (scheduled, live, postponed or suspended) games still change, so they
+# are only cached for a minute; schedules where every game is final are kept
+_LIVE_TTL = 60
+_finished_schedules = LRUCache(maxsize=4096)
+_live_schedules = TTLCache(maxsize=256, ttl=_LIVE_TTL)
+_schedule_lock = threading.Lock()
+
+def _fetch_schedule(game_date: str):
+    key = ('schedule', game_date)
+    disk_cache = _get_disk_cache()
+    sched = disk_cache.get(key)
+    if sched is None:
+        import statsapi  # Imported lazily, only once data actually has to be fetched
+        sched = statsapi.schedule(start_date=game_date, end_date=game_date)
+        disk_cache.set(key, sched, expire=None if _schedule_finished(sched) else _LIVE_TTL)
+    return sched
+
+def _cached_schedule(game_date: str):
+    with _schedule_lock:
+        sched = _finished_schedules.get(game_date)
+        if sched is None:
+            sched = _live_schedules.get(game_date)
+    if sched is None:
+        sched = _single_flight(('schedule', game_date), _fetch_schedule, game_date)
+        cache = _finished_schedules if _schedule_finished(sched) else _live_schedules
+        with _schedule_lock:
+            cache[game_date] = sched
+    return sched
+
+# Boxscores of finished games never change, so they are cached forever (on disk and in memory).
+# A live game's boxscore is only kept in memory for _LIVE_TTL, like its schedule, which is long
+# enough for the stats tool call to use the prefetched boxscore
+_finished_games = set()
+_finished_boxscores = LRUCache(maxsize=256)
+_live_boxscores = TTLCache(maxsize=64, ttl=_LIVE_TTL)
+_boxscore_lock = threading.Lock()
+
+def _mark_finished(game):
+    """Remember a schedule entry's game as finished, so its boxscore may be cached"""
+    if _is_final(game):
+        with _boxscore_lock:
+            _finished_games.add(str(game['game_id']))
+
+def _is_finished(game_id: str):
+    with _boxscore_lock:
+        return game_id in _finished_games
+
+def _fetch_boxscore(game_id: str):
+    key = ('boxscore', game_id)
+    disk_cache = _get_disk_cache()
+    boxscore = disk_cache.get(key)
+    if boxscore is not None:
+        # Only finished games are ever written to disk
+        with _boxscore_lock:
+            _finished_games.add(game_id)
+        return boxscore
+    import statsapi
+    boxscore = statsapi.boxscore_data(game_id)
+    if _is_finished(game_id):
+        disk_cache.set(key, boxscore)
+    return boxscore
+
+def _get_boxscore(game_id: str):
+    with _boxscore_lock:
+        boxscore = _finished_boxscores.get(game_id)
+        if boxscore is None:
+            boxscore = _live_boxscores.get(game_id)
+    if boxscore is None:
+        boxscore = _single_flight(('boxscore', game_id), _fetch_boxscore, game_id)
+        with _boxscore_lock:
+            if game_id in _finished_games:
+                _finished_boxscores[game_id] = boxscore
+            else:
+                _live_boxscores[game_id] = boxscore
+    return boxscore
+
+# Boxscores are downloaded in the background as soon as a game is identified, so the
+# request overlaps with the LLM turns that lead up to the stats tool call
+_prefetch_executor = ThreadPoolExecutor(max_workers=4)
+
+def _prefetch_boxscore(game_id: str):
+    _prefetch_executor.submit(_get_boxscore, game_id)
+
+def _boxscore_rows(boxscores, kind: str):
+    """Join the away and home batters/pitchers (kind "Batters" or "Pitchers") with their player info"""
+    player_info = {p['boxscoreName']: p for p in boxscores['playerInfo'].values()}
+    rows = []
+    for side in ('away', 'home'):
+        team_name = boxscores['teamInfo'][side]['teamName']
+        # The first row of each list holds the column labels
+        for row in boxscores[side + kind][1:]:
+            player = player_info.get(row['name'])
+            if player is not None:
+                rows.append({**row, **player, 'team_name': team_name})
+    return rows
+
+def _format_csv(rows, columns):
+    """Format rows as compact CSV with a header line, which takes fewer tokens than an aligned table"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().rstrip("\n")
+
+@tool
+def get_game_info(game_date: str, team_name: str) -> str:
+    """Gets high-level information on an MLB game.
+
+    Params:
+    game_date: The date of the game of interest, in the form "yyyy-mm-dd". 
+    team_name: MLB team name. Both full name (e.g. "New York Yankees") or nickname ("Yankees") are valid. If multiple teams are mentioned, use the first one
+    """
+    sched = _cached_schedule(game_date)
+    team = team_name.strip().lower()
+    # An empty name would match every summary, so it never matches a game
+    game = next((g for g in sched if team in (g['summary'] or '').lower()), None) if team else None
+    if game is None:
+        return f"No MLB game found for {team_name} on {game_date}"
+    _mark_finished(game)
+    _prefetch_boxscore(str(game['game_id']))
+
+    game_info = [
+        f"Game ID: {game['game_id']}",
+        f"Home Team: {game['home_name']}",
+        f"Home Score: {game['home_score']}",
+        f"Away Team: {game['away_name']}",
+        f"Away Score: {game['away_score']}"
+    ]
+    # Unfinished games have no winner yet, and not every game is part of a series
+    for label, field in (('Winning Team', 'winning_team'), ('Series Status', 'series_status')):
+        if game.get(field):
+            game_info.append(f"{label}: {game[field]}")
+
+    return "\n".join(game_info)
+
+@tool
+def get_boxscore_stats(game_id: str) -> str:
+    """Gets player boxscore batting and pitching stats for a particular MLB game, as CSV tables
+
+    Params:
+    game_id: The 6-digit ID of the game
+    """
+    boxscores=_get_boxscore(str(game_id))
+    batters = _boxscore_rows(boxscores, 'Batters')
+    pitchers = _boxscore_rows(boxscores, 'Pitchers')
+    batting = _format_csv(batters, ['team_name','fullName','position','ab','r','h','hr','rbi','bb','sb'])
+    pitching = _format_csv(pitchers, ['team_name','fullName','ip','h','r','er','bb','k','note'])
+    return f"BATTING:\n{batting}\n\nPITCHING:\n{pitching}"
+
+# Writer and editor instructions are static, so they live in the agent backstories
+# instead of being repeated in every task description
+RECAP_INSTRUCTIONS = """
+Key instructions:
+- Include things like final score, top performers and winning/losing pitcher.
+- Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
+- Do not print the box score
+"""
+
+STRUCTURED_RECAP_INSTRUCTIONS = """
+Key instructions:
+- Structure with the following sections:
+      - Introduction (game result, winning/losing pitchers, top performer on the winning team)
+      - Other key performers on the winning team
+      - Key performers on the losing team
+      - Conclusion (including series result)
+- Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
+- Do not print the box score or write out the section names
+"""
+
+class _RateLimiter:
+    """Blocking token bucket that allows `rate` requests per `period` seconds across threads"""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, *_):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) * self.period / self.rate)
 
 class MLBCrewManager:
     def __init__(self):
         # Load environment variables
         load_dotenv()
         
+        # Groq limits requests per minute, so parallel writers and crews are throttled client-side
+        # and rate limited (429) responses are retried with exponential backoff by the Groq client.
+        # run_many runs at most this many crews at once (each crew runs up to 3 writers in parallel)
+        self.max_concurrent_crews = int(os.getenv("MLB_MAX_CONCURRENT_CREWS", "8"))
+        self.rate_limiter = _RateLimiter(int(os.getenv("GROQ_MAX_RPM", "30")))
+
+        # All LLMs share one Groq client, so concurrent calls reuse the same HTTP/2 connection pool.
+        # The writers already run concurrently as async crew tasks, so they stay ChatGroq agents
+        # instead of being fanned out separately through AsyncGroq
+        self.http_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            event_hooks={"request": [self.rate_limiter.acquire]}
+        )
+        self.groq_client = Groq(
+            http_client=self.http_client,
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", "5"))
+        )
+
         # Initialize LLM instances
-        self.llm_llama70b = ChatGroq(model_name="llama3-70b-8192")
-        self.llm_llama8b = ChatGroq(model_name="llama3-8b-8192")
-        self.llm_gemma2 = ChatGroq(model_name="gemma2-9b-it")
-        self.llm_mixtral = ChatGroq(model_name="mixtral-8x7b-32768")
+        self.llm_llama70b = ChatGroq(model_name="llama3-70b-8192", client=self.groq_client.chat.completions)
+        self.llm_llama8b = ChatGroq(model_name="llama3-8b-8192", client=self.groq_client.chat.completions)
+        self.llm_gemma2 = ChatGroq(model_name="gemma2-9b-it", client=self.groq_client.chat.completions)
+        self.llm_mixtral = ChatGroq(model_name="mixtral-8x7b-32768", client=self.groq_client.chat.completions)
         
-        # Initialize agents
-        self.initialize_agents()
-        
-        # Initialize tasks
-        self.initialize_tasks()
+        # Initialize crew (agents and tasks don't depend on the prompt, only the inputs do)
+        self.crew = self._build_crew()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-    def initialize_agents(self):
-        """Initialize all MLB agents"""
-        self.mlb_researcher = Agent(
+    def close(self):
+        """Close the HTTP connections shared by the LLMs"""
+        self.http_client.close()
+
+    def _build_agents(self):
+        """Build all MLB agents: the researcher, the statistician, the writers and the editor"""
+        researcher = Agent(
             llm=self.llm_llama70b,
             role="MLB Researcher",
             goal="Identify and return info for the MLB game related to the user prompt by returning the exact results of the get_game_info tool",
             backstory="An MLB researcher that identifies games for statisticians to analyze stats from",
-            tools=[self.get_game_info],
+            tools=[get_game_info],
             verbose=True,
             allow_delegation=False
         )
 
-        self.mlb_statistician = Agent(
+        statistician = Agent(
             llm=self.llm_llama70b,
             role="MLB Statistician",
             goal="Retrieve player batting and pitching stats for the game identified by the MLB Researcher",
             backstory="An MLB Statistician analyzing player boxscore stats for the relevant game",
-            tools=[self.get_batting_stats, self.get_pitching_stats],
+            tools=[get_boxscore_stats],
             verbose=True,
             allow_delegation=False
         )
 
-        self.mlb_writer_llama = Agent(
+        # The writers only differ in their LLM and instructions
+        writers = [
+            self._make_writer(self.llm_llama8b, RECAP_INSTRUCTIONS),
+            self._make_writer(self.llm_gemma2, RECAP_INSTRUCTIONS),
+            self._make_writer(self.llm_mixtral, STRUCTURED_RECAP_INSTRUCTIONS)
+        ]
+
+        editor = Agent(
             llm=self.llm_llama8b,
-            role="MLB Writer",
-            goal="Write a detailed game recap article using the provided game information and stats",
-            backstory="An experienced and honest writer who does not make things up",
+            role="MLB Editor",
+            goal="Edit multiple game recap articles to create the best final product.",
+            backstory=(
+                "An experienced editor that excels at taking the best parts of multiple texts to create the best final product\n"
+                + STRUCTURED_RECAP_INSTRUCTIONS
+                + "\nIt is especially important that no false information, such as any inning or the inning in which an event occured, "
+                "is present in the final product. If a piece of information is present in one article and not the others, it is probably false"
+            ),
             tools=[],
             verbose=True,
             allow_delegation=False
         )
 
-        self.mlb_writer_gemma = Agent(
-            llm=self.llm_gemma2,
-            role="MLB Writer",
-            goal="Write a detailed game recap article using the provided game information and stats",
-            backstory="An experienced and honest writer who does not make things up",
-            tools=[],
-            verbose=True,
-            allow_delegation=False
-        )
+        return researcher, statistician, writers, editor
 
-        self.mlb_writer_mixtral = Agent(
-            llm=self.llm_mixtral,
+    @staticmethod
+    def _make_writer(llm, instructions: str):
+        """Create an MLB writer agent for the given LLM and key instructions"""
+        return Agent(
+            llm=llm,
             role="MLB Writer",
             goal="Write a detailed game recap article using the provided game information and stats",
-            backstory="An experienced and honest writer who does not make things up",
+            backstory="An experienced and honest writer who does not make things up\n" + instructions,
             tools=[],
             verbose=True,
             allow_delegation=False
         )
 
-        self.mlb_editor = Agent(
-            llm=self.llm_llama70b,
-            role="MLB Editor",
-            goal="Edit multiple game recap articles to create the best final product.",
-            backstory="An experienced editor that excels at taking the best parts of multiple texts to create the best final product",
-            tools=[],
-            verbose=True,
-            allow_delegation=False
-        )
+    def _build_tasks(self, researcher, statistician, writers, editor):
+        """Build all MLB tasks for the given agents, in execution order
 
-    def initialize_tasks(self):
-        """Initialize all MLB tasks"""
-        self.collect_game_info = Task(
+        The writer tasks only depend on the game info and stats tasks, so they are
+        marked async: the crew dispatches them together and joins them at the editor.
+        The editor only reconciles the three articles against the game info, so it
+        runs on the small model and doesn't get the full stats tables.
+        """
+        collect_game_info = Task(
             description='''
             Identify the correct game related to the user prompt and return game info using the get_game_info tool. 
             Unless a specific date is provided in the user prompt, use {default_date} as the game date
             User prompt: {user_prompt}
             ''',
             expected_output='High-level information of the relevant MLB game',
-            agent=self.mlb_researcher
-        )
-
-        self.retrieve_batting_stats = Task(
-            description='Retrieve ONLY boxscore batting stats for the relevant MLB game',
-            expected_output='A table of batting boxscore stats',
-            agent=self.mlb_statistician,
-            dependencies=[self.collect_game_info],
-            context=[self.collect_game_info]
-        )
-
-        self.retrieve_pitching_stats = Task(
-            description='Retrieve ONLY boxscore pitching stats for the relevant MLB game',
-            expected_output='A table of pitching boxscore stats',
-            agent=self.mlb_statistician,
-            dependencies=[self.collect_game_info],
-            context=[self.collect_game_info]
-        )
-
-        self.write_game_recap_llama = Task(
-            description='''
-            Write a game recap article using the provided game information and stats.
-            Key instructions:
-            - Include things like final score, top performers and winning/losing pitcher.
-            - Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
-            - Do not print the box score
-            ''',
-            expected_output='An MLB game recap article',
-            agent=self.mlb_writer_llama,
-            dependencies=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats],
-            context=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats]
+            agent=researcher
         )
 
-        self.write_game_recap_gemma = Task(
-            description='''
-            Write a game recap article using the provided game information and stats.
-            Key instructions:
-            - Include things like final score, top performers and winning/losing pitcher.
-            - Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
-            - Do not print the box score
-            ''',
-            expected_output='An MLB game recap article',
-            agent=self.mlb_writer_gemma,
-            dependencies=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats],
-            context=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats]
+        retrieve_stats = Task(
+            description='Retrieve boxscore batting and pitching stats for the relevant MLB game',
+            expected_output='A CSV table of batting and a CSV table of pitching boxscore stats',
+            agent=statistician,
+            dependencies=[collect_game_info],
+            context=[collect_game_info]
         )
 
-        self.write_game_recap_mixtral = Task(
-            description='''
-            Write a succinct game recap article using the provided game information and stats.
-            Key instructions:
-            - Structure with the following sections:
-                  - Introduction (game result, winning/losing pitchers, top performer on the winning team)
-                  - Other key performers on the winning team
-                  - Key performers on the losing team
-                  - Conclusion (including series result)
-            - Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
-            - Do not print the box score or write out the section names
-            ''',
-            expected_output='An MLB game recap article',
-            agent=self.mlb_writer_mixtral,
-            dependencies=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats],
-            context=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats]
-        )
+        writer_descriptions = [
+            'Write a game recap article using the provided game information and stats (given as CSV tables).',
+            'Write a game recap article using the provided game information and stats (given as CSV tables).',
+            'Write a succinct game recap article using the provided game information and stats (given as CSV tables).'
+        ]
+        write_game_recaps = [
+            Task(
+                description=description,
+                expected_output='An MLB game recap article',
+                agent=writer,
+                async_execution=True,
+                dependencies=[collect_game_info, retrieve_stats],
+                context=[collect_game_info, retrieve_stats]
+            )
+            for writer, description in zip(writers, writer_descriptions)
+        ]
 
-        self.edit_game_recap = Task(
+        edit_game_recap = Task(
             description='''
             You will be provided three game recap articles from multiple writers. Take the best of
-            all three to output the optimal final article.
-            
-            Pay close attention to the original instructions:
-
-            Key instructions:
-                - Structure with the following sections:
-                  - Introduction (game result, winning/losing pitchers, top performer on the winning team)
-                  - Other key performers on the winning team
-                  - Key performers on the losing team
-                  - Conclusion (including series result)
-                - Use ONLY the provided data and DO NOT make up any information, such as specific innings when events occurred, that isn't explicitly from the provided input.
-                - Do not print the box score or write out the section names
-
-            It is especially important that no false information, such as any inning or the inning in which an event occured, 
-            is present in the final product. If a piece of information is present in one article and not the others, it is probably false
+            all three to output the optimal final article, following your key instructions.
             ''',
             expected_output='An MLB game recap article',
-            agent=self.mlb_editor,
-            dependencies=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats],
-            context=[self.collect_game_info, self.retrieve_batting_stats, self.retrieve_pitching_stats]
+            agent=editor,
+            dependencies=write_game_recaps,
+            context=[collect_game_info, *write_game_recaps]
         )
 
-    @staticmethod
-    @tool
-    def get_game_info(game_date: str, team_name: str) -> str:
-        """Gets high-level information on an MLB game.
-        
-        Params:
-        game_date: The date of the game of interest, in the form "yyyy-mm-dd". 
-        team_name: MLB team name. Both full name (e.g. "New York Yankees") or nickname ("Yankees") are valid. If multiple teams are mentioned, use the first one
-        """
-        sched = statsapi.schedule(start_date=game_date,end_date=game_date)
-        sched_df = pd.DataFrame(sched)
-        game_info_df = sched_df[sched_df['summary'].str.contains(team_name, case=False, na=False)]
-
-        game_id = str(game_info_df.game_id.tolist()[0])
-        home_team = game_info_df.home_name.tolist()[0]
-        home_score = game_info_df.home_score.tolist()[0]
-        away_team = game_info_df.away_name.tolist()[0]
-        away_score = game_info_df.away_score.tolist()[0]
-        winning_team = game_info_df.winning_team.tolist()[0]
-        series_status = game_info_df.series_status.tolist()[0]
-
-        game_info = '''
-            Game ID: {game_id}
-            Home Team: {home_team}
-            Home Score: {home_score}
-            Away Team: {away_team}
-            Away Score: {away_score}
-            Winning Team: {winning_team}
-            Series Status: {series_status}
-        '''.format(game_id = game_id, home_team = home_team, home_score = home_score, 
-                   away_team = away_team, away_score = away_score, \
-                    series_status = series_status, winning_team = winning_team)
-
-        return game_info
-
-    @staticmethod
-    @tool
-    def get_batting_stats(game_id: str) -> str:
-        """Gets player boxscore batting stats for a particular MLB game
-        
-        Params:
-        game_id: The 6-digit ID of the game
-        """
-        boxscores=statsapi.boxscore_data(game_id)
-        player_info_df = pd.DataFrame(boxscores['playerInfo']).T.reset_index()
-
-        away_batters_box = pd.DataFrame(boxscores['awayBatters']).iloc[1:]
-        away_batters_box['team_name'] = boxscores['teamInfo']['away']['teamName']
-
-        home_batters_box = pd.DataFrame(boxscores['homeBatters']).iloc[1:]
-        home_batters_box['team_name'] = boxscores['teamInfo']['home']['teamName']
+        return [collect_game_info, retrieve_stats, *write_game_recaps, edit_game_recap]
 
-        batters_box_df = pd.concat([away_batters_box, home_batters_box]).merge(player_info_df, left_on = 'name', right_on = 'boxscoreName')
-        return str(batters_box_df[['team_name','fullName','position','ab','r','h','hr','rbi','bb','sb']])
+    def _build_crew(self):
+        """Build an MLB crew with its own agents and tasks
 
-    @staticmethod
-    @tool
-    def get_pitching_stats(game_id: str) -> str:
-        """Gets player boxscore pitching stats for a particular MLB game
-        
-        Params:
-        game_id: The 6-digit ID of the game
+        Every crew is built from scratch instead of with Crew.copy(): crewAI's copy rebuilds
+        each task's context from task copies that never run, and matches agents by role.
         """
-        boxscores=statsapi.boxscore_data(game_id)
-        player_info_df = pd.DataFrame(boxscores['playerInfo']).T.reset_index()
-
-        away_pitchers_box = pd.DataFrame(boxscores['awayPitchers']).iloc[1:]
-        away_pitchers_box['team_name'] = boxscores['teamInfo']['away']['teamName']
-
-        home_pitchers_box = pd.DataFrame(boxscores['homePitchers']).iloc[1:]
-        home_pitchers_box['team_name'] = boxscores['teamInfo']['home']['teamName']
-
-        pitchers_box_df = pd.concat([away_pitchers_box,home_pitchers_box]).merge(player_info_df, left_on = 'name', right_on = 'boxscoreName')
-        return str(pitchers_box_df[['team_name','fullName','ip','h','r','er','bb','k','note']])
-
-    def run_crew(self, user_prompt: str):
-        """Run the MLB crew with the given user prompt"""
-        default_date = datetime.now().date() - timedelta(1)  # Set default date to yesterday
-        
-        crew = Crew(
-            agents=[
-                self.mlb_researcher, self.mlb_statistician,
-                self.mlb_writer_llama, self.mlb_writer_gemma,
-                self.mlb_writer_mixtral, self.mlb_editor
-            ],
-            tasks=[
-                self.collect_game_info,
-                self.retrieve_batting_stats, self.retrieve_pitching_stats,
-                self.write_game_recap_llama, self.write_game_recap_gemma,
-                self.write_game_recap_mixtral, self.edit_game_recap
-            ],
+        researcher, statistician, writers, editor = self._build_agents()
+        return Crew(
+            agents=[researcher, statistician, *writers, editor],
+            tasks=self._build_tasks(researcher, statistician, writers, editor),
             verbose=False
         )
-        
-        result = crew.kickoff(inputs={
+
+    @staticmethod
+    def crew_inputs(user_prompt: str):
+        """Build the crew inputs for the given user prompt"""
+        default_date = datetime.now().date() - timedelta(1)  # Set default date to yesterday
+        return {
             "user_prompt": user_prompt,
             "default_date": str(default_date)
-        })
+        }
+
+    def run_crew(self, user_prompt: str):
+        """Run the MLB crew with the given user prompt"""
+        result = self.crew.kickoff(inputs=self.crew_inputs(user_prompt))
         
         # Save the result to report.txt
         with open('report.txt', 'w') as f:
@@ -296,12 +445,25 @@ class MLBCrewManager:
         
         return result
 
+    async def run_many(self, user_prompts: list[str]):
+        """Run the MLB crew concurrently for each of the given user prompts
+
+        Every prompt gets a freshly built crew, and at most MLB_MAX_CONCURRENT_CREWS crews run
+        at the same time.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_crews)
+
+        async def run_one(user_prompt: str):
+            async with semaphore:
+                return await self._build_crew().kickoff_async(inputs=self.crew_inputs(user_prompt))
+
+        return await asyncio.gather(*(run_one(user_prompt) for user_prompt in user_prompts))
+
 if __name__ == "__main__":
     # Create MLB crew manager instance
-    mlb_manager = MLBCrewManager()
-    
-    # Run the crew with a sample prompt
-    user_prompt = 'Write a recap of the Yankees game on July 14, 2024'
-    result = mlb_manager.run_crew(user_prompt)
-    print(result)
+    with MLBCrewManager() as mlb_manager:
+        # Run the crew with a sample prompt
+        user_prompt = 'Write a recap of the Yankees game on July 14, 2024'
+        result = mlb_manager.run_crew(user_prompt)
+        print(result)
     
\ No newline at end of file